@@ -1,168 +1,543 @@
 ## Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 ## SPDX-License-Identifier: MIT-0
 
-import json
+import hashlib
 import os
+import re
+import threading
+import time
 import boto3
+import numpy
+import orjson
 import urllib3
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from langchain.retrievers import AmazonKendraRetriever
-from langchain.chains import ConversationalRetrievalChain
-from langchain.prompts import PromptTemplate
-from langchain.llms.bedrock import Bedrock
-from langchain.chains.llm import LLMChain
-from botocore.response import StreamingBody
+
+# Bounded cache of Kendra results keyed on the hash of the standalone
+# question, shared by all users (and concurrent batch workers) of the warm
+# container, so reads and eviction happen under a lock
+RETRIEVER_CACHE_MAXSIZE = 512
+retriever_cache = OrderedDict()
+retriever_cache_lock = threading.Lock()
+
+class CachingKendraRetriever(AmazonKendraRetriever):
+  """Kendra retriever that caches results per question for the warm container."""
+
+  def _get_relevant_documents(self, query, *, run_manager):
+    key = hashlib.sha1(query.encode('utf-8')).hexdigest()
+    with retriever_cache_lock:
+      docs = retriever_cache.get(key)
+      if docs is not None:
+        retriever_cache.move_to_end(key)
+        return docs
+
+    docs = super()._get_relevant_documents(query, run_manager=run_manager)
+    with retriever_cache_lock:
+      retriever_cache[key] = docs
+      while len(retriever_cache) > RETRIEVER_CACHE_MAXSIZE:
+        retriever_cache.popitem(last=False)
+    return docs
+
 def build_chain():
   region = os.environ["AWS_REGION"]
   kendra_index_id = os.environ["KENDRA_INDEX_ID"]
-  boto3_bedrock = boto3.client(
-      service_name='bedrock-runtime',
-      region_name=region,
-  )
-
-
-  llm = Bedrock(
-      client=boto3_bedrock,
-      region_name = region,
-      model_kwargs={"max_tokens_to_sample":300,"temperature":1,"top_k":250,"top_p":0.999,"anthropic_version":"bedrock-2023-05-31"},
-      model_id="anthropic.claude-v2"
-  )
-      
-  retriever = AmazonKendraRetriever(index_id=kendra_index_id,top_k=5,region_name=region)
-
-
-  prompt_template = """Human: This is a friendly conversation between a human and an AI. 
-  The AI is talkative and provides specific details from its context but limits it to 240 tokens.
-  If the AI does not know the answer to a question, it truthfully says it 
-  does not know.
-
-  Assistant: OK, got it, I'll be a talkative truthful AI assistant.
-
-  Human: Here are a few documents in <documents> tags:
-  <documents>
-  {context}
-  </documents>
-  Based on the above documents, provide a detailed answer for, {question} 
-  Answer "don't know" if not present in the document. 
-
-  Assistant:
-  """
-  PROMPT = PromptTemplate(
-      template=prompt_template, input_variables=["context", "question"]
-  )
-
-  condense_qa_template = """{chat_history}
-  Human:
-  Given the previous conversation and a follow up question below, rephrase the follow up question
-  to be a standalone question.
-
-  Follow Up Question: {question}
-  Standalone Question:
-
-  Assistant:"""
-  standalone_question_prompt = PromptTemplate.from_template(condense_qa_template)
-
-
-  
-  qa = ConversationalRetrievalChain.from_llm(
-        llm=llm, 
-        retriever=retriever, 
-        condense_question_prompt=standalone_question_prompt, 
-        return_source_documents=True, 
-        combine_docs_chain_kwargs={"prompt":PROMPT},
-        verbose=True)
-
-  # qa = ConversationalRetrievalChain.from_llm(llm=llm, retriever=retriever, qa_prompt=PROMPT, return_source_documents=True)
-  return qa
-chat_history = []
-qa = build_chain()
-# Initialize AWS clients for Bedrock and Secrets Manager
+  retriever = CachingKendraRetriever(index_id=kendra_index_id,top_k=5,region_name=region)
+
+  return retriever
+
+
+# Model settings for the Converse API
+MODEL_ID = "anthropic.claude-v2"
+INFERENCE_CONFIG = {"maxTokens": 300, "temperature": 1, "topP": 0.999}
+ADDITIONAL_MODEL_FIELDS = {"top_k": 250}
+# Latency-optimized inference roughly halves Claude response time where the
+# region/model supports it; gated behind an env var so everything else keeps
+# the standard profile.
+LATENCY_OPTIMIZED = os.environ.get("BEDROCK_LATENCY_OPTIMIZED", "").lower() in ("1", "true", "yes")
+
+
+# Prompt skeletons are plain format strings compiled once at import; the hot
+# path only fills in the dynamic fields
+QA_PROMPT = """Human: This is a friendly conversation between a human and an AI.
+The AI is talkative and provides specific details from its context but limits it to 240 tokens.
+If the AI does not know the answer to a question, it truthfully says it
+does not know.
+
+Assistant: OK, got it, I'll be a talkative truthful AI assistant.
+
+Human: Here are a few documents in <documents> tags:
+<documents>
+{context}
+</documents>
+Based on the above documents, provide a detailed answer for, {question}
+Answer "don't know" if not present in the document.
+
+Assistant:
+"""
+
+CONDENSE_PROMPT = """{chat_history}
+Human:
+Given the previous conversation and a follow up question below, rephrase the follow up question
+to be a standalone question.
+
+Follow Up Question: {question}
+Standalone Question:
+
+Assistant:"""
+# Per-user conversation history, bounded so condense-question prompts stay a
+# constant size instead of growing for the lifetime of the container. Each
+# stored question/answer is also truncated, capping the whole condense prompt
+# at roughly 2 KB regardless of how verbose the answers get.
+HISTORY_TURN_MAX_CHARS = 500
+chat_history = defaultdict(lambda: deque(maxlen=6))
+
+# The retriever is built lazily on the first real message so cold starts that
+# only serve a url_verification ping (or a deduplicated retry) never pay for
+# it; the lock keeps concurrent batch workers from building it twice
+_qa = None
+_qa_lock = threading.Lock()
+
+def get_qa():
+	"""
+	Returns the Kendra retriever, building it on first use.
+
+	Returns:
+		CachingKendraRetriever: The shared retriever for this container.
+	"""
+	global _qa
+	if _qa is None:
+		with _qa_lock:
+			if _qa is None:
+				_qa = build_chain()
+	return _qa
+# Initialize AWS clients for Bedrock, Secrets Manager and Lambda
 bedrock_runtime_client = boto3.client('bedrock-runtime')
 secretsmanager_client = boto3.client('secretsmanager')
+lambda_client = boto3.client('lambda')
+
+# Cap on how many batched Slack events are answered concurrently in one
+# invocation
+MAX_BATCH_WORKERS = 10
+
+# In-process semantic cache: questions whose Titan embedding is close enough
+# to a recent one reuse that answer instead of paying another Kendra lookup
+# and Bedrock call. Entries are keyed on the Kendra index so switching the
+# index naturally busts the cache. LRU-evicted and TTL-bounded; survives for
+# the warm lifetime of the container.
+SEMANTIC_CACHE_MAXSIZE = 128
+SEMANTIC_CACHE_TTL = 300.0
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', '0.92'))
+EMBEDDING_MODEL_ID = 'amazon.titan-embed-text-v1'
+
+# Concurrent batch workers share the cache, so expiry, eviction and the hit
+# counters all mutate under one lock
+semantic_cache = OrderedDict()
+semantic_cache_lock = threading.Lock()
+semantic_cache_stats = {'hits': 0, 'misses': 0}
+
+def embed_question(question):
+	"""
+	Computes the Titan embedding of a question.
+
+	Args:
+		question (str): The question to embed.
+
+	Returns:
+		numpy.ndarray: The embedding vector, or None if embedding failed.
+	"""
+	try:
+		response = bedrock_runtime_client.invoke_model(
+			body=orjson.dumps({'inputText': question}),
+			modelId=EMBEDDING_MODEL_ID,
+			accept='application/json',
+			contentType='application/json'
+		)
+		# orjson parses the raw bytes directly, and closing the StreamingBody
+		# hands its HTTPS connection back to the pool straight away instead of
+		# holding it until garbage collection
+		body = response['body']
+		try:
+			response_body = orjson.loads(body.read())
+		finally:
+			body.close()
+	except Exception:
+		# A cache miss is always safe; never let the embedding call take down
+		# the answer path
+		return None
+
+	return numpy.array(response_body['embedding'])
+
+def semantic_cache_lookup(embedding):
+	"""
+	Finds a cached answer whose question embedding is close to the given one.
+
+	Args:
+		embedding (numpy.ndarray): The embedding of the incoming question.
+
+	Returns:
+		str: The cached answer, or None on a miss.
+	"""
+	now = time.monotonic()
+	kendra_index_id = os.environ["KENDRA_INDEX_ID"]
+	with semantic_cache_lock:
+		for key, (cached_embedding, answer, index_id, ts) in list(semantic_cache.items()):
+			if now - ts > SEMANTIC_CACHE_TTL:
+				del semantic_cache[key]
+				continue
+			if index_id != kendra_index_id:
+				continue
+			similarity = numpy.dot(embedding, cached_embedding) / (
+				numpy.linalg.norm(embedding) * numpy.linalg.norm(cached_embedding)
+			)
+			if similarity > SEMANTIC_CACHE_THRESHOLD:
+				semantic_cache.move_to_end(key)
+				semantic_cache_stats['hits'] += 1
+				print(orjson.dumps({'semantic_cache': dict(semantic_cache_stats, event='hit')}).decode())
+				return answer
+
+		semantic_cache_stats['misses'] += 1
+		print(orjson.dumps({'semantic_cache': dict(semantic_cache_stats, event='miss')}).decode())
+	return None
+
+def semantic_cache_store(question, embedding, answer):
+	"""
+	Writes an answered question through to the semantic cache.
+
+	Args:
+		question (str): The original question, used as the cache key.
+		embedding (numpy.ndarray): The embedding of the question.
+		answer (str): The full answer text to reuse.
+	"""
+	with semantic_cache_lock:
+		semantic_cache[question] = (embedding, answer, os.environ["KENDRA_INDEX_ID"], time.monotonic())
+		semantic_cache.move_to_end(question)
+		while len(semantic_cache) > SEMANTIC_CACHE_MAXSIZE:
+			semantic_cache.popitem(last=False)
+
+# Slack redelivers events it believes were not acknowledged; remember
+# recently seen event ids so a retry never re-runs the Bedrock call.
+# Concurrent batch workers share the store, so expiry and the
+# check-then-insert run under one lock.
+EVENT_DEDUPE_TTL = 600.0
+seen_event_ids = OrderedDict()
+seen_event_lock = threading.Lock()
+
+def seen_event(event_id):
+	"""
+	Records a Slack event id and reports whether it was already handled.
+
+	Args:
+		event_id (str): The event_id from the Slack event envelope.
+
+	Returns:
+		bool: True if the event was already seen within the dedupe TTL.
+	"""
+	now = time.monotonic()
+	with seen_event_lock:
+		while seen_event_ids:
+			oldest_id, ts = next(iter(seen_event_ids.items()))
+			if now - ts > EVENT_DEDUPE_TTL:
+				del seen_event_ids[oldest_id]
+			else:
+				break
+
+		if event_id in seen_event_ids:
+			return True
+
+		seen_event_ids[event_id] = now
+		return False
+
+def forget_event(event_id):
+	"""
+	Drops a Slack event id from the dedupe store.
+
+	Used when handling failed after the id was recorded, so a redelivery of
+	the same event is answered instead of dropped as a duplicate.
+
+	Args:
+		event_id (str): The event_id from the Slack event envelope.
+	"""
+	with seen_event_lock:
+		seen_event_ids.pop(event_id, None)
+
+# Strips the leading <@Uxxx> bot mention (and trailing whitespace) from a
+# message; compiled once so messages without a mention come back unchanged
+# with no new allocation
+BOT_MENTION_RE = re.compile(r'<@U[A-Z0-9]+>\s*')
+
+# Bounds on the answer posted back to Slack: at most 3 distinct source links
+# and 2500 characters total, safely under Slack's 3000-character block limit
+MAX_SOURCES = 3
+MAX_SLACK_TEXT = 2500
 
-# Set the Slack API URL and fetch the Slack token from Secrets Manager
+# Static response bodies, serialized once at import
+ACK_BODY = orjson.dumps({'msg': "message recevied"}).decode()
+DUPLICATE_BODY = orjson.dumps({'msg': "duplicate ignored"}).decode()
+
+# Set the Slack API URLs
 SLACK_URL = 'https://slack.com/api/chat.postMessage'
-slack_token = json.loads(
-	secretsmanager_client.get_secret_value(
-		SecretId=os.environ.get('token')
-	)['SecretString']
-)['token'] 
-http = urllib3.PoolManager()
+SLACK_UPDATE_URL = 'https://slack.com/api/chat.update'
+SLACK_AUTH_TEST_URL = 'https://slack.com/api/auth.test'
+# Shared connection pool for the Slack API. Sized for concurrent batch
+# workers, with short timeouts and a couple of retries so a slow Slack call
+# never stalls the whole invocation. 429s are deliberately not retried:
+# urllib3 would sleep for Slack's Retry-After (often tens of seconds) in the
+# middle of the streaming token loop, so a rate-limited chat.update simply
+# fails and the next flush carries the accumulated text.
+http = urllib3.PoolManager(
+	maxsize=MAX_BATCH_WORKERS,
+	block=False,
+	retries=urllib3.Retry(total=2, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504]),
+	timeout=urllib3.Timeout(connect=1.0, read=3.0)
+)
+
+@lru_cache(maxsize=1)
+def get_slack_token():
+	"""
+	Fetches the Slack bot token from Secrets Manager.
+
+	Lazy so that cold starts and url_verification pings never pay the
+	Secrets Manager round-trip; cached for the lifetime of the container.
+
+	Returns:
+		str: The Slack bot token.
+	"""
+	return orjson.loads(
+		secretsmanager_client.get_secret_value(
+			SecretId=os.environ.get('token')
+		)['SecretString']
+	)['token']
+
+@lru_cache(maxsize=1)
+def get_bot_user_id():
+	"""
+	Fetches the bot's own Slack user id via auth.test.
+
+	Cached for the container lifetime, replacing the hardcoded user id that
+	had to be edited for every new Slack app installation.
 
-def handle_challenge(event):
+	Returns:
+		str: The bot's user id.
+	"""
+	return post_to_slack(SLACK_AUTH_TEST_URL, {}).get('user_id')
+
+def post_to_slack(url, data):
+	"""
+	Sends a JSON payload to a Slack Web API method.
+
+	Args:
+		url (str): The Slack API method URL.
+		data (dict): The payload for the API call.
+
+	Returns:
+		dict: The parsed JSON response from Slack.
+	"""
+	response = http.request(
+		'POST',
+		url,
+		headers={
+			'Authorization': f'Bearer {get_slack_token()}',
+			'Content-Type': 'application/json',
+		},
+		body=orjson.dumps(data)
+	)
+
+	return orjson.loads(response.data)
+
+class SlackStreamingHandler:
+	"""
+	Streams Bedrock tokens to Slack by editing a placeholder message.
+
+	Posts an initial message when generation starts, then edits it with
+	chat.update as tokens arrive. Updates are flushed on sentence
+	boundaries and throttled to stay under Slack's rate limit of roughly
+	one message update per second per channel.
+	"""
+
+	UPDATE_INTERVAL = 1.0
+
+	def __init__(self, channel, prefix):
+		self.channel = channel
+		self.prefix = prefix
+		self.ts = None
+		self.text = ''
+		self.last_update = 0.0
+
+	def start(self):
+		if self.ts is None:
+			response = post_to_slack(SLACK_URL, {
+				'channel': self.channel,
+				'text': f"{self.prefix} ..."
+			})
+			self.ts = response.get('ts')
+
+	def on_token(self, token):
+		self.text += token
+		now = time.monotonic()
+		if (self.ts is not None
+				and token.endswith(('.', '!', '?', '\n'))
+				and now - self.last_update >= self.UPDATE_INTERVAL):
+			self.last_update = now
+			self.update(self.text)
+
+	def update(self, text):
+		post_to_slack(SLACK_UPDATE_URL, {
+			'channel': self.channel,
+			'ts': self.ts,
+			'text': f"{self.prefix} {text}"
+		})
+
+def handle_challenge(body):
 	"""
 	Handles the Slack challenge event for verifying the URL.
 	https://api.slack.com/events/url_verification
 
 	Args:
-		event (dict): The event data from the Slack challenge.
+		body (dict): The parsed body of the Slack challenge.
 
 	Returns:
 		dict: A response dictionary with the status code and the challenge value.
 	"""
-	body = json.loads(event['body'])
-
 	return {
 		'statusCode': 200,
 		'body': body['challenge']
 	}
 
-def handle_message(event):
+def handle_message(event, body):
 	"""
 	Handles the Slack message event and calls the Bedrock AI model.
 
 	Args:
 		event (dict): The event data from the Slack message.
+		body (dict): The parsed body of the Slack event.
 
 	Returns:
 		dict: A response dictionary with the status code and a message.
 	"""
-	slack_body = json.loads(event['body'])
-	slack_text = slack_body.get('event').get('text')
-	slack_user = slack_body.get('event').get('user')
-	channel = slack_body.get('event').get('channel')
-	if (slack_user != "U079K9G0R7X"):
-		# Replace the bot username with an empty string
-		msg = call_bedrock(slack_text.replace('<@U079K9G0R7X>', ''))
-	
-		# Prepare the data for the Slack API request
-		data = {
-			'channel': channel,
-			'text': f"<@{slack_user}> {msg}"
-		}
-	
-		headers = {
-			'Authorization': f'Bearer {slack_token}',
-			'Content-Type': 'application/json',
-		}
-
-		# Send the message to the Slack API
-		http.request(
-			'POST',
-			SLACK_URL,
-			headers=headers,
-			body=json.dumps(data)
-		)
+	slack_event = body.get('event') or {}
+	slack_text = slack_event.get('text')
+	slack_user = slack_event.get('user')
+	channel = slack_event.get('channel')
+	if (slack_user and slack_user != get_bot_user_id()):
+		# Strip the bot mention from the question
+		streamer = SlackStreamingHandler(channel, f"<@{slack_user}>")
+		msg = call_bedrock(BOT_MENTION_RE.sub('', slack_text, count=1).strip(), slack_user, streamer)
+
+		# Push the final text (answer plus sources) to Slack, editing the
+		# streamed message if one was posted
+		if streamer.ts is not None:
+			streamer.update(msg)
+		else:
+			post_to_slack(SLACK_URL, {
+				'channel': channel,
+				'text': f"<@{slack_user}> {msg}"
+			})
 
 	return {
 		'statusCode': 200,
-		'body': json.dumps({'msg': "message recevied"})
+		'body': ACK_BODY
 	}
 
 
 
-def run_chain(chain, prompt: str, history=[]):
-	return chain({"question": prompt, "chat_history": history})
+def converse(prompt, streamer=None):
+	"""
+	Runs one model turn through the Bedrock Converse API, streaming tokens.
+
+	Args:
+		prompt (str): The fully formatted prompt for the model.
+		streamer (SlackStreamingHandler): Optional handler fed each token.
+
+	Returns:
+		str: The full generated text.
+	"""
+	kwargs = {
+		'modelId': MODEL_ID,
+		'messages': [{'role': 'user', 'content': [{'text': prompt}]}],
+		'inferenceConfig': INFERENCE_CONFIG,
+		'additionalModelRequestFields': ADDITIONAL_MODEL_FIELDS,
+	}
+	if LATENCY_OPTIMIZED:
+		kwargs['performanceConfig'] = {'latency': 'optimized'}
+
+	response = bedrock_runtime_client.converse_stream(**kwargs)
+	parts = []
+	usage = {}
+	for stream_event in response['stream']:
+		if 'contentBlockDelta' in stream_event:
+			token = stream_event['contentBlockDelta']['delta'].get('text', '')
+			parts.append(token)
+			if streamer is not None:
+				streamer.on_token(token)
+		elif 'metadata' in stream_event:
+			usage = stream_event['metadata'].get('usage', {})
+
+	# Structured usage log so maxTokens sizing and prompt bloat show up in
+	# CloudWatch
+	print(orjson.dumps({'bedrock_usage': dict(usage, modelId=MODEL_ID)}).decode())
+
+	return ''.join(parts)
+
+def run_chain(retriever, prompt: str, history=[], streamer=None):
+	"""
+	Answers a question with a single retrieval and a single model call.
+
+	The condense-question step only runs when there is existing history, so
+	a fresh Slack thread pays exactly one Bedrock round-trip instead of the
+	two ConversationalRetrievalChain always made.
+
+	Args:
+		retriever: The Kendra retriever from build_chain.
+		prompt (str): The user's question.
+		history: Prior (question, answer) turns for this user.
+		streamer (SlackStreamingHandler): Optional handler for the answer.
 
-def call_bedrock(question):
-	
-	result = run_chain(qa, question, chat_history)
-	chat_history.append((question, result["answer"]))
-	result2 = result['answer'] 
-	if 'source_documents' in result:
-		result2=result2+"\\n Sources:"
-		for d in result['source_documents']:
-			result2=result2+"\\n" + d.metadata['source']
-	return result2 
+	Returns:
+		dict: The standalone question, the answer and the source documents.
+	"""
+	question = prompt
+	if history:
+		conversation = "\n".join(f"Human: {q}\nAssistant: {a}" for q, a in history)
+		question = converse(
+			CONDENSE_PROMPT.format(chat_history=conversation, question=prompt)
+		).strip()
+
+	docs = retriever.get_relevant_documents(question)
+	context = "\n".join(doc.page_content for doc in docs)
+	if streamer is not None:
+		streamer.start()
+	answer = converse(
+		QA_PROMPT.format(context=context, question=question),
+		streamer
+	).strip()
+
+	return {'question': question, 'answer': answer, 'source_documents': docs}
+
+def call_bedrock(question, slack_user, streamer=None):
+
+	# Serve semantically identical questions from cache without touching
+	# Kendra or the LLM
+	embedding = embed_question(question)
+	if embedding is not None:
+		cached = semantic_cache_lookup(embedding)
+		if cached is not None:
+			return cached
+
+	history = chat_history[slack_user]
+	result = run_chain(get_qa(), question, history, streamer)
+	history.append((question[:HISTORY_TURN_MAX_CHARS], result["answer"][:HISTORY_TURN_MAX_CHARS]))
+	result2 = result['answer']
+	if result.get('source_documents'):
+		sources = dict.fromkeys(d.metadata['source'] for d in result['source_documents'])
+		result2 = result2 + "\n Sources:\n" + "\n".join(list(sources)[:MAX_SOURCES])
+	result2 = result2[:MAX_SLACK_TEXT]
+
+	if embedding is not None:
+		semantic_cache_store(question, embedding, result2)
+
+	return result2
 
 def handler(event, context):
 	"""
@@ -175,12 +550,89 @@ def handler(event, context):
 	Returns:
 		dict: The response dictionary based on the event type.
 	"""
+	# Batched events (e.g. an SQS trigger with BatchSize > 1) carry a Records
+	# list; fan them out over a thread pool so one invocation serves the whole
+	# batch instead of paying N sequential Bedrock round-trips. Each record is
+	# guarded like the HTTP path (bot filter, event-id dedupe) and isolated so
+	# one failure only redelivers its own record via batchItemFailures.
+	records = event.get('Records')
+	if records:
+		def process_record(record):
+			event_id = None
+			try:
+				raw = record['body']
+				if '"bot_id"' in raw or '"subtype":"bot_message"' in raw:
+					return None
+				body = orjson.loads(raw)
+				event_id = body.get('event_id')
+				if event_id and seen_event(event_id):
+					return None
+				handle_message(record, body)
+				return None
+			except Exception:
+				# Forget the id so the SQS redelivery this failure triggers is
+				# answered rather than dropped as a duplicate
+				if event_id:
+					forget_event(event_id)
+				print(orjson.dumps({'batch_record_failed': record.get('messageId')}).decode())
+				return record.get('messageId')
+
+		with ThreadPoolExecutor(max_workers=min(len(records), MAX_BATCH_WORKERS)) as pool:
+			failures = [message_id for message_id in pool.map(process_record, records) if message_id]
+
+		# Partial-batch response: SQS redelivers only the failed records
+		return {
+			'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failures]
+		}
+
+	# Worker half of the async dispatch below: finish the Bedrock call and the
+	# Slack post outside the request/response cycle
+	if event.get('async_dispatch'):
+		return handle_message(event, orjson.loads(event['body']))
+
+	# Bot-authored messages (including our own replies echoed back by Slack)
+	# never get an answer; a substring scan of the raw body is far cheaper
+	# than a full JSON parse
+	raw_body = event.get('body') or ''
+	if '"bot_id"' in raw_body or '"subtype":"bot_message"' in raw_body:
+		return {
+			'statusCode': 200,
+			'body': ACK_BODY
+		}
+
+	# A retry header means Slack already delivered this event; acknowledge it
+	# without spending another Bedrock invocation
+	headers = event.get('headers') or {}
+	if headers.get('x-slack-retry-num'):
+		return {
+			'statusCode': 200,
+			'headers': {'X-Slack-No-Retry': '1'},
+			'body': DUPLICATE_BODY
+		}
+
 	# Respond to the Slack Challenge if presented, otherwise handle the Bedrock interaction
-	event_body = json.loads(event.get("body"))
+	event_body = orjson.loads(event.get("body"))
+	event_id = event_body.get('event_id')
 	response = None
 	if event_body.get("type") == "url_verification":
-		response = handle_challenge(event)
+		response = handle_challenge(event_body)
+	elif event_id and seen_event(event_id):
+		response = {
+			'statusCode': 200,
+			'headers': {'X-Slack-No-Retry': '1'},
+			'body': DUPLICATE_BODY
+		}
 	else:
-		response = handle_message(event)
+		# Ack Slack inside its 3 second deadline and hand the Bedrock work to
+		# a fire-and-forget re-invocation of this function
+		lambda_client.invoke(
+			FunctionName=context.invoked_function_arn,
+			InvocationType='Event',
+			Payload=orjson.dumps({'async_dispatch': True, 'body': event['body']})
+		)
+		response = {
+			'statusCode': 200,
+			'body': ACK_BODY
+		}
 
 	return response
\ No newline at end of file
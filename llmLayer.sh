@@ -3,4 +3,5 @@ pip install --platform manylinux2014_x86_64 --target llmLayer/python --python-ve
 pip install --platform manylinux2014_x86_64 --target llmLayer/python --python-version 3.12 --only-binary=:all: boto3
 pip install --platform manylinux2014_x86_64 --target llmLayer/python --python-version 3.12 --only-binary=:all: langchain
 pip install --platform manylinux2014_x86_64 --target llmLayer/python --python-version 3.12 --only-binary=:all: langchain-community
+pip install --platform manylinux2014_x86_64 --target llmLayer/python --python-version 3.12 --only-binary=:all: orjson
 #cd llmLayer && zip ../llmLayer.zip * -r
\ No newline at end of file
@@ -41,10 +41,19 @@ export class SlackBotStack extends Stack {
 		lambdaRole.addToPolicy(
 			new PolicyStatement({
 				effect: Effect.ALLOW,
-				actions: ["bedrock:InvokeModel"],
+				actions: ["bedrock:InvokeModel", "bedrock:InvokeModelWithResponseStream"],
 				resources: ["*"],
 			}),
 		);
+		// The function re-invokes itself asynchronously to finish the Bedrock
+		// call and the Slack reply after acking the Slack event.
+		lambdaRole.addToPolicy(
+			new PolicyStatement({
+				effect: Effect.ALLOW,
+				actions: ["lambda:InvokeFunction"],
+				resources: [`arn:${this.partition}:lambda:${this.region}:${this.account}:function:SlackBotLambda`],
+			}),
+		);
 		lambdaRole.addManagedPolicy(ManagedPolicy.fromAwsManagedPolicyName("service-role/AWSLambdaBasicExecutionRole"));
 		slackBotToken.grantRead(lambdaRole);
 